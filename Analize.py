@@ -1,61 +1,66 @@
 import streamlit as st
 import numpy as np
+import matplotlib
+matplotlib.use('agg')
 import matplotlib.pyplot as plt
 import tempfile
 import os
 
-# Importar librosa de manera segura
-try:
-    import librosa
-    LIBROSA_AVAILABLE = True
-except ImportError:
-    LIBROSA_AVAILABLE = False
+from voice_analyzer import SimpleVoiceAnalyzer, AUDIO_LIBS_AVAILABLE
+
+if not AUDIO_LIBS_AVAILABLE:
     st.error("""
-        Error: No se pudo cargar la librería librosa. 
+        Error: No se pudieron cargar las librerías de audio (librosa, soundfile, soxr).
         Por favor, asegúrate de que todas las dependencias están instaladas correctamente.
         Ejecuta: pip install -r requirements.txt
     """)
 
-class SimpleVoiceAnalyzer:
-    def __init__(self, file_path):
-        self.file_path = file_path
-        self.y = None
-        self.sr = None
+# Puntos de la forma de onda que se guardan para el gráfico
+WAVEFORM_POINTS = 4000
+
+def _waveform_preview(y, sr):
+    """Diezma la señal a unos WAVEFORM_POINTS puntos para el gráfico"""
+    step = max(1, len(y) // WAVEFORM_POINTS)
+    t = np.arange(0, len(y), step) / sr
+    return t, np.array(y[::step])
+
+# Cada entrada guarda solo resultados y la forma de onda diezmada
+@st.cache_data(show_spinner=False, max_entries=16)
+def _analyze_bytes(data: bytes) -> dict:
+    """Analiza el audio subido; el resultado se memoriza por contenido del archivo"""
+    # Crear archivo temporal
+    with tempfile.NamedTemporaryFile(delete=False, suffix='.mp3') as tmp_file:
+        tmp_file.write(data)
+        temp_filename = tmp_file.name
+        
+    try:
+        analyzer = SimpleVoiceAnalyzer(temp_filename)
         
-    def load_audio(self):
-        """Carga el archivo de audio de manera segura"""
         try:
-            self.y, self.sr = librosa.load(self.file_path)
-            return True
+            analyzer.load_audio()
         except Exception as e:
             st.error(f"Error al cargar el audio: {str(e)}")
-            return False
+            return None
             
-    def analyze_voice(self):
-        """Análisis básico de voz"""
         try:
-            # Extraer características
-            pitches, magnitudes = librosa.piptrack(y=self.y, sr=self.sr)
-            
-            # Calcular estadísticas básicas
-            pitch_mean = np.mean(pitches[pitches > 0])
-            pitch_std = np.std(pitches[pitches > 0])
-            
-            # Clasificación simple
-            if pitch_mean < 150:  # Umbral aproximado entre voz masculina y femenina
-                voice_type = "Masculina"
-            else:
-                voice_type = "Femenina"
-                
-            return {
-                'tipo_voz': voice_type,
-                'pitch_medio': pitch_mean,
-                'pitch_std': pitch_std
-            }
-            
+            results = analyzer.analyze_voice()
         except Exception as e:
             st.error(f"Error en el análisis: {str(e)}")
-            return None
+            results = None
+            
+        t, y = _waveform_preview(analyzer.y, analyzer.sr)
+        return {
+            'resultados': results,
+            't': t,
+            'y': y
+        }
+        
+    finally:
+        # Limpiar archivo temporal
+        try:
+            os.unlink(temp_filename)
+        except:
+            pass
 
 def main():
     st.title("🎤 Analizador de Voz Simplificado")
@@ -65,50 +70,37 @@ def main():
     Formatos soportados: MP3, WAV
     """)
     
-    if not LIBROSA_AVAILABLE:
-        st.warning("La aplicación no puede funcionar sin librosa. Por favor, instala todas las dependencias.")
+    if not AUDIO_LIBS_AVAILABLE:
+        st.warning("La aplicación no puede funcionar sin las librerías de audio. Por favor, instala todas las dependencias.")
         return
         
     uploaded_file = st.file_uploader("Elige un archivo de audio", type=['mp3', 'wav'])
     
     if uploaded_file is not None:
-        # Crear archivo temporal
-        with tempfile.NamedTemporaryFile(delete=False, suffix='.mp3') as tmp_file:
-            tmp_file.write(uploaded_file.getvalue())
-            temp_filename = tmp_file.name
-            
         try:
             with st.spinner('Analizando el audio...'):
-                analyzer = SimpleVoiceAnalyzer(temp_filename)
+                analysis = _analyze_bytes(uploaded_file.getvalue())
                 
-                if analyzer.load_audio():
-                    # Realizar análisis
-                    results = analyzer.analyze_voice()
+                if analysis is not None and analysis['resultados']:
+                    results = analysis['resultados']
+                    st.success("¡Análisis completado!")
+                    
+                    # Mostrar resultados
+                    st.subheader("Resultados del Análisis")
+                    st.write(f"**Tipo de Voz Detectada:** {results['tipo_voz']}")
+                    st.write(f"**Pitch Medio:** {results['pitch_medio']:.2f} Hz")
+                    st.write(f"**Desviación Estándar del Pitch:** {results['pitch_std']:.2f} Hz")
+                    
+                    # Crear visualización simple
+                    fig, ax = plt.subplots()
+                    ax.plot(analysis['t'], analysis['y'], linewidth=0.5)
+                    ax.set_xlabel('Tiempo (s)')
+                    ax.set_title('Forma de Onda del Audio')
+                    st.pyplot(fig, use_container_width=True, clear_figure=True)
+                    plt.close(fig)
                     
-                    if results:
-                        st.success("¡Análisis completado!")
-                        
-                        # Mostrar resultados
-                        st.subheader("Resultados del Análisis")
-                        st.write(f"**Tipo de Voz Detectada:** {results['tipo_voz']}")
-                        st.write(f"**Pitch Medio:** {results['pitch_medio']:.2f} Hz")
-                        st.write(f"**Desviación Estándar del Pitch:** {results['pitch_std']:.2f} Hz")
-                        
-                        # Crear visualización simple
-                        fig, ax = plt.subplots()
-                        librosa.display.waveshow(analyzer.y, sr=analyzer.sr, ax=ax)
-                        ax.set_title('Forma de Onda del Audio')
-                        st.pyplot(fig)
-                        
         except Exception as e:
             st.error(f"Error inesperado: {str(e)}")
-            
-        finally:
-            # Limpiar archivo temporal
-            try:
-                os.unlink(temp_filename)
-            except:
-                pass
     
     st.markdown("""
     ### Instrucciones
@@ -0,0 +1 @@
+# Permite importar voice_analyzer desde tests/ al ejecutar pytest en la raíz
@@ -0,0 +1,241 @@
+import numpy as np
+import pytest
+
+pytest.importorskip("librosa")
+
+from voice_analyzer import SAMPLE_RATE, SimpleVoiceAnalyzer, analyze_batch
+
+
+def _analyzer_for(y):
+    analyzer = SimpleVoiceAnalyzer(None)
+    analyzer.y = np.ascontiguousarray(y, dtype=np.float32)
+    analyzer.sr = SAMPLE_RATE
+    return analyzer
+
+
+def _tone(freq, seconds, amplitude=0.5):
+    t = np.arange(int(seconds * SAMPLE_RATE)) / SAMPLE_RATE
+    return amplitude * np.sin(2 * np.pi * freq * t)
+
+
+def _silence(seconds):
+    return np.zeros(int(seconds * SAMPLE_RATE))
+
+
+@pytest.mark.parametrize("freq, expected", [(110, "Masculina"), (220, "Femenina")])
+def test_voice_surrounded_by_silence(freq, expected):
+    y = np.concatenate([_silence(3), _tone(freq, 3), _silence(3)])
+
+    results = _analyzer_for(y).analyze_voice()
+
+    assert results['tipo_voz'] == expected
+    assert results['pitch_medio'] == pytest.approx(freq, rel=0.05)
+    assert results['pitch_std'] < 10
+
+
+def test_noise_only_has_no_voice():
+    rng = np.random.default_rng(0)
+    y = 0.2 * rng.standard_normal(4 * SAMPLE_RATE)
+
+    results = _analyzer_for(y).analyze_voice()
+
+    assert results['tipo_voz'] == 'Sin voz'
+    assert results['pitch_medio'] == 0.0
+
+
+def test_noise_after_voice_is_ignored():
+    rng = np.random.default_rng(0)
+    y = np.concatenate([_tone(110, 3), 0.05 * rng.standard_normal(3 * SAMPLE_RATE)])
+
+    results = _analyzer_for(y).analyze_voice()
+
+    assert results['tipo_voz'] == 'Masculina'
+    assert results['pitch_medio'] == pytest.approx(110, rel=0.05)
+    assert results['pitch_std'] < 10
+
+
+def test_silent_audio():
+    results = _analyzer_for(_silence(2)).analyze_voice()
+
+    assert results['tipo_voz'] == 'Silencio'
+    assert results['pitch_medio'] == 0.0
+
+
+def test_batch_reports_missing_file_without_aborting(tmp_path, monkeypatch):
+    sf = pytest.importorskip("soundfile")
+    import voice_analyzer
+
+    # Los workers creados con fork heredan el parche
+    monkeypatch.setattr(voice_analyzer, "CACHE_DIR", str(tmp_path / "cache"))
+    good = tmp_path / "voz.wav"
+    sf.write(good, np.concatenate([_silence(1), _tone(110, 2)]), SAMPLE_RATE)
+
+    results = analyze_batch([str(good), str(tmp_path / "no_existe.wav")])
+
+    assert results[0]['tipo_voz'] == 'Masculina'
+    assert 'error' in results[1]
+
+
+def test_cache_is_pruned_to_max_size(tmp_path, monkeypatch):
+    sf = pytest.importorskip("soundfile")
+    import voice_analyzer
+
+    cache_dir = tmp_path / "cache"
+    monkeypatch.setattr(voice_analyzer, "CACHE_DIR", str(cache_dir))
+    # Cabe una forma de onda de 1 s en float32, pero no dos
+    monkeypatch.setattr(voice_analyzer, "CACHE_MAX_BYTES", SAMPLE_RATE * 4 + 1024)
+
+    for freq in (110, 220):
+        path = tmp_path / f"voz_{freq}.wav"
+        sf.write(path, _tone(freq, 1), SAMPLE_RATE)
+        SimpleVoiceAnalyzer(str(path)).load_audio()
+
+    cached = [p.name for p in cache_dir.iterdir()]
+    assert len(cached) == 1
+    assert cached[0].endswith('.npy')
+
+
+class _FakeTensor:
+    def __init__(self, array):
+        self.array = np.asarray(array)
+
+    def unsqueeze(self, dim):
+        return _FakeTensor(np.expand_dims(self.array, dim))
+
+    def squeeze(self, dim):
+        return _FakeTensor(np.squeeze(self.array, dim))
+
+    def cpu(self):
+        return self
+
+    def numpy(self):
+        return self.array
+
+
+def test_torchcrepe_path_matches_rms_frames(monkeypatch):
+    import types
+    import librosa
+    import voice_analyzer
+
+    calls = {}
+
+    def weighted_argmax(*args):
+        pass
+
+    def predict(audio, sample_rate, hop_length, decoder, device, **kwargs):
+        calls.update(sample_rate=sample_rate, hop_length=hop_length,
+                     decoder=decoder, device=device, shape=audio.array.shape,
+                     writeable=audio.array.flags.writeable)
+        n_frames = 1 + audio.array.shape[1] // hop_length
+        return _FakeTensor(np.full((1, n_frames), 110.0))
+
+    fake_torch = types.SimpleNamespace(
+        cuda=types.SimpleNamespace(is_available=lambda: True),
+        from_numpy=_FakeTensor,
+    )
+    fake_crepe = types.SimpleNamespace(
+        predict=predict,
+        decode=types.SimpleNamespace(weighted_argmax=weighted_argmax),
+    )
+    monkeypatch.setattr(voice_analyzer, "TORCHCREPE_AVAILABLE", True)
+    monkeypatch.setattr(voice_analyzer, "torch", fake_torch, raising=False)
+    monkeypatch.setattr(voice_analyzer, "torchcrepe", fake_crepe, raising=False)
+
+    y = np.concatenate([_silence(1), _tone(110, 2)])
+    analyzer = _analyzer_for(y)
+    # Como en un acierto de caché, donde self.y es un memmap de solo lectura
+    analyzer.y.setflags(write=False)
+    f0 = analyzer.extract_pitch()
+    rms = librosa.feature.rms(
+        y=analyzer.y, frame_length=voice_analyzer.FRAME_LENGTH,
+        hop_length=voice_analyzer.HOP_LENGTH
+    )[0]
+
+    assert calls['sample_rate'] == voice_analyzer.CREPE_SAMPLE_RATE
+    assert calls['hop_length'] == 2 * voice_analyzer.HOP_LENGTH
+    assert calls['decoder'] is weighted_argmax
+    assert calls['device'] == 'cuda'
+    assert calls['shape'][0] == 1
+    assert calls['writeable']
+    assert f0.ndim == 1
+    assert f0.shape == rms.shape
+
+    results = analyzer.analyze_voice()
+    assert results['tipo_voz'] == 'Masculina'
+    assert results['pitch_medio'] == pytest.approx(110)
+
+
+def _write_tone(tmp_path, freq=110, seconds=1, sr=16000):
+    sf = pytest.importorskip("soundfile")
+    path = tmp_path / f"voz_{freq}.wav"
+    t = np.arange(int(seconds * sr)) / sr
+    sf.write(path, 0.5 * np.sin(2 * np.pi * freq * t), sr)
+    return str(path)
+
+
+def test_cache_hit_matches_decoded_audio(tmp_path, monkeypatch):
+    import voice_analyzer
+
+    monkeypatch.setattr(voice_analyzer, "CACHE_DIR", str(tmp_path / "cache"))
+    path = _write_tone(tmp_path)
+
+    miss = SimpleVoiceAnalyzer(path)
+    miss.load_audio()
+    hit = SimpleVoiceAnalyzer(path)
+    hit.load_audio()
+
+    assert len(list((tmp_path / "cache").glob("*.npy"))) == 1
+    assert hit.sr == miss.sr == SAMPLE_RATE
+    np.testing.assert_array_equal(hit.y, miss.y)
+
+
+def test_corrupt_cache_falls_back_to_decoding(tmp_path, monkeypatch):
+    import voice_analyzer
+
+    monkeypatch.setattr(voice_analyzer, "CACHE_DIR", str(tmp_path / "cache"))
+    path = _write_tone(tmp_path)
+    expected = SimpleVoiceAnalyzer(path)
+    expected.load_audio()
+    cache_path = expected._cache_path()
+    with open(cache_path, 'wb') as f:
+        f.write(b'no es un npy')
+
+    analyzer = SimpleVoiceAnalyzer(path)
+    analyzer.load_audio()
+
+    assert analyzer.sr == SAMPLE_RATE
+    np.testing.assert_array_equal(analyzer.y, expected.y)
+
+
+def test_prune_removes_stale_tmp_files(tmp_path, monkeypatch):
+    import os
+    import voice_analyzer
+
+    cache_dir = tmp_path / "cache"
+    cache_dir.mkdir()
+    monkeypatch.setattr(voice_analyzer, "CACHE_DIR", str(cache_dir))
+    stale = cache_dir / "abandonado.tmp"
+    stale.write_bytes(b"0" * 16)
+    old = os.stat(stale).st_mtime - voice_analyzer.CACHE_TMP_MAX_AGE - 1
+    os.utime(stale, (old, old))
+    fresh = cache_dir / "escribiendo.tmp"
+    fresh.write_bytes(b"0" * 16)
+
+    voice_analyzer._prune_cache()
+
+    assert not stale.exists()
+    assert fresh.exists()
+
+
+def test_error_without_message_reports_exception_name(tmp_path, monkeypatch):
+    import voice_analyzer
+
+    class NoBackendError(Exception):
+        pass
+
+    def fail(self):
+        raise NoBackendError()
+
+    monkeypatch.setattr(voice_analyzer.SimpleVoiceAnalyzer, "load_audio", fail)
+
+    assert voice_analyzer.analyze_one(str(tmp_path / "junk.mp3")) == {'error': 'NoBackendError'}
@@ -0,0 +1,292 @@
+import numpy as np
+import tempfile
+import hashlib
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+# Importar las librerías de audio (librosa, soundfile, soxr) de manera segura
+try:
+    import librosa
+    import soundfile as sf
+    import soxr
+    AUDIO_LIBS_AVAILABLE = True
+except ImportError:
+    AUDIO_LIBS_AVAILABLE = False
+
+# torchcrepe es opcional: solo se usa si hay una GPU CUDA disponible
+try:
+    import torch
+    import torchcrepe
+    TORCHCREPE_AVAILABLE = True
+except ImportError:
+    TORCHCREPE_AVAILABLE = False
+
+# Frecuencia de muestreo de trabajo: suficiente para el pitch de la voz (C2-C7)
+SAMPLE_RATE = 8000
+
+# Rango de búsqueda del pitch y tamaño de los frames de análisis
+FMIN = 65
+FMAX = 500
+FRAME_LENGTH = 1024
+HOP_LENGTH = 256
+
+# Frecuencia de muestreo que espera el modelo CREPE
+CREPE_SAMPLE_RATE = 16000
+
+# Frames con energía por debajo de esta fracción del máximo se tratan como silencio
+RMS_THRESHOLD = 0.1
+
+# Detección de frames sonoros: el ruido tiene un espectro plano (planitud ~0.56
+# para ruido blanco) y un pitch que salta de un frame a otro; la voz no
+FLATNESS_THRESHOLD = 0.3
+MAX_PITCH_JUMP = 1 / 12  # en octavas (un semitono por hop)
+MIN_VOICED_RUN = 4  # frames seguidos, unos 130 ms a 8 kHz
+
+# Directorio donde se guardan las formas de onda ya decodificadas
+CACHE_DIR = os.path.join(tempfile.gettempdir(), 'voice_cache')
+
+# Tamaño máximo de la caché; al superarlo se borran los archivos menos usados
+CACHE_MAX_BYTES = 512 * 1024 * 1024
+
+# Antigüedad (s) a partir de la cual un .tmp de la caché se considera abandonado
+CACHE_TMP_MAX_AGE = 3600
+
+def _prune_cache():
+    """Borra los .tmp abandonados y los .npy menos usados hasta caber en CACHE_MAX_BYTES"""
+    entries = []
+    now = time.time()
+    for name in os.listdir(CACHE_DIR):
+        if not name.endswith(('.npy', '.tmp')):
+            continue
+        path = os.path.join(CACHE_DIR, name)
+        try:
+            info = os.stat(path)
+            # Temporales abandonados por un proceso que terminó a medias
+            if name.endswith('.tmp') and now - info.st_mtime > CACHE_TMP_MAX_AGE:
+                os.unlink(path)
+                continue
+        except OSError:
+            continue
+        entries.append((info.st_mtime, info.st_size, name))
+            
+    # Los .tmp recientes cuentan para el tamaño, pero se están escribiendo
+    total = sum(size for _, size, _ in entries)
+    for _, size, name in sorted(entries):
+        if total <= CACHE_MAX_BYTES:
+            break
+        if name.endswith('.tmp'):
+            continue
+        try:
+            os.unlink(os.path.join(CACHE_DIR, name))
+        except OSError:
+            pass
+        total -= size
+
+class SimpleVoiceAnalyzer:
+    def __init__(self, file_path):
+        self.file_path = file_path
+        self.y = None
+        self.sr = None
+        
+    def load_audio(self):
+        """Carga el archivo de audio; los errores de lectura se propagan al llamador"""
+        cache_path = self._cache_path()
+        self.y = self._load_cache(cache_path)
+        
+        if self.y is not None:
+            self.sr = SAMPLE_RATE
+        else:
+            self.y, self.sr = self._decode()
+            self._save_cache(cache_path)
+            
+        self.y = np.ascontiguousarray(self.y, dtype=np.float32)
+            
+    def _load_cache(self, cache_path):
+        """Lee la forma de onda en caché; si no existe o no se puede leer, devuelve None"""
+        try:
+            # Evita decodificar de nuevo un archivo ya visto
+            y = np.load(cache_path, mmap_mode='r')
+        except (OSError, ValueError, EOFError):
+            # No existe, la borró otra sesión o está corrupto: se decodifica
+            return None
+            
+        try:
+            os.utime(cache_path)
+        except OSError:
+            pass
+        return y
+            
+    def _decode(self):
+        """Decodifica con libsndfile y remuestrea con soxr; si falla, usa librosa.load"""
+        try:
+            data, sr = sf.read(self.file_path, dtype='float32', always_2d=False)
+        except RuntimeError:
+            # Formatos que libsndfile no soporta pasan por audioread
+            return librosa.load(self.file_path, sr=SAMPLE_RATE, mono=True)
+            
+        if data.ndim > 1:
+            data = data.mean(axis=1)
+        if sr != SAMPLE_RATE:
+            data = soxr.resample(data, sr, SAMPLE_RATE)
+        return data, SAMPLE_RATE
+        
+    def _cache_path(self):
+        """Ruta del .npy en caché según el contenido del archivo"""
+        sha1 = hashlib.sha1()
+        with open(self.file_path, 'rb') as f:
+            for chunk in iter(lambda: f.read(1 << 20), b''):
+                sha1.update(chunk)
+        return os.path.join(CACHE_DIR, f'{sha1.hexdigest()}_{SAMPLE_RATE}.npy')
+        
+    def _save_cache(self, cache_path):
+        """Guarda la forma de onda decodificada; un fallo aquí no es crítico"""
+        tmp_path = None
+        try:
+            os.makedirs(CACHE_DIR, exist_ok=True)
+            # Nombre temporal único: varias sesiones (hilos) pueden guardar a la vez
+            with tempfile.NamedTemporaryFile(dir=CACHE_DIR, suffix='.tmp', delete=False) as f:
+                tmp_path = f.name
+                np.save(f, np.asarray(self.y, dtype=np.float32))
+            os.replace(tmp_path, cache_path)
+            _prune_cache()
+        except OSError:
+            if tmp_path and os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+            
+    def extract_pitch(self):
+        """Extrae el pitch por frame, en GPU con torchcrepe si es posible"""
+        if TORCHCREPE_AVAILABLE and torch.cuda.is_available():
+            # CREPE trabaja a 16 kHz: se remuestrea aquí con soxr para que
+            # torchcrepe no lo haga en CPU con resampy. El resultado es un
+            # array nuevo y escribible aunque self.y sea un memmap de la caché
+            if self.sr != CREPE_SAMPLE_RATE:
+                audio = soxr.resample(self.y, self.sr, CREPE_SAMPLE_RATE)
+            else:
+                audio = np.array(self.y)
+                
+            # Mismo hop en segundos que yin/rms para que los frames coincidan
+            hop_length = HOP_LENGTH * CREPE_SAMPLE_RATE // self.sr
+            f0 = torchcrepe.predict(
+                torch.from_numpy(audio).unsqueeze(0), CREPE_SAMPLE_RATE,
+                hop_length=hop_length, fmin=FMIN, fmax=FMAX, model='tiny',
+                decoder=torchcrepe.decode.weighted_argmax,
+                batch_size=2048, device='cuda'
+            )
+            return f0.squeeze(0).cpu().numpy()
+            
+        return librosa.yin(
+            self.y, fmin=FMIN, fmax=FMAX, sr=self.sr,
+            frame_length=FRAME_LENGTH, hop_length=HOP_LENGTH
+        )
+            
+    def _voiced_mask(self, f0):
+        """Marca los frames sonoros: con energía, espectro no plano y pitch estable"""
+        rms = librosa.feature.rms(
+            y=self.y, frame_length=FRAME_LENGTH, hop_length=HOP_LENGTH
+        )[0]
+        flatness = librosa.feature.spectral_flatness(
+            y=self.y, n_fft=FRAME_LENGTH, hop_length=HOP_LENGTH
+        )[0]
+        n = min(f0.size, rms.size, flatness.size)
+        if n < MIN_VOICED_RUN:
+            return np.zeros(n, dtype=bool)
+        f0, rms, flatness = f0[:n], rms[:n], flatness[:n]
+        
+        # yin no decide si un frame es sonoro: en silencio devuelve valores
+        # pegados a fmin/fmax y en ruido un pitch aleatorio. Se quitan los
+        # frames de poca energía, de espectro plano o en los límites del
+        # rango (esto también descarta NaN)
+        candidate = (
+            (rms >= RMS_THRESHOLD * rms.max())
+            & (flatness < FLATNESS_THRESHOLD)
+            & (f0 > FMIN * 1.01)
+            & (f0 < FMAX * 0.99)
+        )
+        
+        # Solo cuentan los tramos de al menos MIN_VOICED_RUN frames en los
+        # que el pitch varía menos de MAX_PITCH_JUMP entre vecinos
+        with np.errstate(divide='ignore', invalid='ignore'):
+            steady = np.abs(np.diff(np.log2(f0))) < MAX_PITCH_JUMP
+        links = candidate[:-1] & candidate[1:] & steady
+        run = MIN_VOICED_RUN - 1
+        starts = np.convolve(links, np.ones(run, dtype=int), 'valid') == run
+        return np.convolve(starts, np.ones(MIN_VOICED_RUN, dtype=int))[:n] > 0
+        
+    def analyze_voice(self):
+        """Análisis básico de voz; los errores se propagan al llamador"""
+        # Audio vacío o casi en silencio: no hay pitch que analizar
+        if self.y is None or self.y.size == 0 or np.abs(self.y).max() < 1e-3:
+            return {
+                'tipo_voz': 'Silencio',
+                'pitch_medio': 0.0,
+                'pitch_std': 0.0
+            }
+
+        # Extraer características
+        f0 = self.extract_pitch()
+        voiced = self._voiced_mask(f0)
+        f0 = f0[:voiced.size][voiced]
+        
+        if f0.size == 0:
+            # Hay energía pero ningún tramo sonoro estable (p. ej. solo ruido)
+            return {
+                'tipo_voz': 'Sin voz',
+                'pitch_medio': 0.0,
+                'pitch_std': 0.0
+            }
+
+        # Calcular estadísticas básicas a partir de sumas (media y desviación)
+        n = f0.size
+        s = f0.sum(dtype=np.float64)
+        s2 = np.dot(f0, f0)
+        pitch_mean = s / n
+        pitch_std = np.sqrt(max(s2 / n - pitch_mean * pitch_mean, 0.0))
+        
+        # Clasificación simple
+        if pitch_mean < 150:  # Umbral aproximado entre voz masculina y femenina
+            voice_type = "Masculina"
+        else:
+            voice_type = "Femenina"
+            
+        return {
+            'tipo_voz': voice_type,
+            'pitch_medio': pitch_mean,
+            'pitch_std': pitch_std
+        }
+
+def analyze_one(path):
+    """Ejecuta el análisis completo de un archivo; si falla, devuelve el error"""
+    try:
+        analyzer = SimpleVoiceAnalyzer(path)
+        analyzer.load_audio()
+        return analyzer.analyze_voice()
+    except Exception as e:
+        # Algunas excepciones (p. ej. NoBackendError) no tienen mensaje
+        return {'error': str(e) or type(e).__name__}
+
+def analyze_batch(paths, max_workers=None):
+    """Analiza varios archivos en paralelo, un proceso por archivo"""
+    if not paths:
+        return []
+        
+    workers = min(len(paths), max_workers or os.cpu_count() or 1)
+    with ProcessPoolExecutor(max_workers=workers) as ex:
+        return list(ex.map(analyze_one, paths))
+
+if __name__ == "__main__":
+    paths = sys.argv[1:]
+    
+    if not paths:
+        print(f"Uso: python {os.path.basename(sys.argv[0])} archivo1.mp3 [archivo2.wav ...]",
+              file=sys.stderr)
+        sys.exit(1)
+        
+    for path, results in zip(paths, analyze_batch(paths)):
+        if 'error' in results:
+            print(f"{path}: no se pudo analizar ({results['error']})")
+        else:
+            print(f"{path}: {results['tipo_voz']} "
+                  f"(pitch medio {results['pitch_medio']:.2f} Hz, "
+                  f"std {results['pitch_std']:.2f} Hz)")